@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 from axio_common.logger import logger
@@ -10,6 +10,18 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 
 Base = declarative_base()
 
+
+# Give every mapped class a frozenset of its writable column names, computed
+# once when the class is mapped; from_dict/update_from_dict filter incoming
+# dicts by it. Generated (Computed) columns are left out, since the database
+# rejects writes to them.
+@event.listens_for(Base, "instrument_class", propagate=True)
+def _cache_column_names(mapper, cls):
+    cls._COLUMN_NAMES = frozenset(
+        column.name for column in mapper.local_table.columns if column.computed is None
+    )
+
+
 # psycopg2 TCP keepalives so idle connections don't get silently killed by
 # Fly.io / managed-postgres middleboxes. Without these we'd see transient
 # "SSL SYSCALL error: Success" from sockets that the kernel still thinks
@@ -38,18 +50,23 @@ engine = create_engine(
 )
 SessionLocal = sessionmaker(bind=engine)
 
-# Create all tables. Don't crash module import if the DB is unreachable —
-# that prevents the FastAPI app from starting at all, which kills routes
-# (storage, submit-defaults, health) that don't even need the DB. In prod
-# the schema is migrated by alembic; this call is mostly a safety net for
+# Create any missing tables. Not run at import: importing this module must not
+# open a DB connection (that stalls every worker's startup, and an unreachable
+# DB would keep the FastAPI app from starting at all, killing routes like
+# storage, submit-defaults and health that don't need it). It also ran before
+# any model was imported, so Base.metadata was still empty. In prod the schema
+# is migrated by alembic; call this once at app startup as a safety net for
 # fresh local dev environments.
-try:
-    Base.metadata.create_all(bind=engine)
-except Exception as _e:
-    logger.warning(
-        f"axio_common.database: skipped create_all at import time: {_e}. "
-        "Endpoints that hit the DB will still error until the connection is restored."
-    )
+def init_db():
+    import axio_common.models  # noqa: F401 -- registers every table on Base.metadata
+    try:
+        Base.metadata.create_all(bind=engine)
+    except Exception as _e:
+        logger.warning(
+            f"axio_common.database: skipped create_all: {_e}. "
+            "Endpoints that hit the DB will still error until the connection is restored."
+        )
+
 
 # Dependency to get database session
 def get_db():
@@ -58,3 +75,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency that commits once when the request finishes (and rolls back if the
+# handler raised), so handlers can call model mutators with commit=False
+# instead of committing after every change.
+def get_db_transaction():
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
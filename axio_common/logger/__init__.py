@@ -1 +1 @@
-from .logger_config import logger, hostname_filter
\ No newline at end of file
+from .logger_config import logger, hostname_filter, configure_once
@@ -1,39 +1,67 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
 import threading
 import socket
 
 
+# Resolve the host identity once at import. gethostbyname() is a DNS round trip
+# that can block for seconds on a cold resolver, so don't repeat it per filter.
+_CACHED_HOSTNAME = socket.gethostname()
+try:
+    _CACHED_IP = socket.gethostbyname(_CACHED_HOSTNAME)
+except socket.gaierror:
+    _CACHED_IP = "ipaddress_unknown"
+
+
 # Custom logging filter to include hostname and IP address
 class HostnameFilter(logging.Filter):
     def __init__(self):
         super().__init__()
         self.local = threading.local()
         # Default to actual hostname and IP
-        self.local.hostname = socket.gethostname()
-        try:
-            self.local.ipaddress = socket.gethostbyname(socket.gethostname())
-        except socket.gaierror:
-            self.local.ipaddress = "ipaddress_unknown"
+        self.local.hostname = _CACHED_HOSTNAME
+        self.local.ipaddress = _CACHED_IP
 
     def set_hostname(self, hostname=None):
-        self.local.hostname = hostname if hostname else socket.gethostname()
+        self.local.hostname = hostname if hostname else _CACHED_HOSTNAME
 
     def set_ipaddress(self, ipaddress=None):
         self.local.ipaddress = ipaddress if ipaddress else "ipaddress_unknown"
 
     def filter(self, record):
-        record.hostname = getattr(self.local, "hostname", "hostname_unknown")
-        record.ipaddress = getattr(self.local, "ipaddress", "ipaddress_unknown")
+        # configure_once() stamps records at creation via the record factory,
+        # so nothing here attaches this filter any more. Consumers that still
+        # addFilter() it only pay for records that bypassed the factory.
+        if not hasattr(record, "hostname"):
+            record.hostname = getattr(self.local, "hostname", "hostname_unknown")
+            record.ipaddress = getattr(self.local, "ipaddress", "ipaddress_unknown")
         return True
 
 class SafeFormatter(logging.Formatter):
+    """
+    Renders the fixed layout
+    "[%(levelname)s] [%(hostname)s/%(ipaddress)s] [%(module)s:%(funcName)s:%(lineno)d] %(message)s"
+    with a single f-string instead of Formatter's generic %-style template path.
+    Records that never went through the hostname record factory fall back to
+    unknown_host/unknown_ip.
+    """
     def format(self, record):
-        if not hasattr(record, "hostname"):
-            record.hostname = "unknown_host"
-        if not hasattr(record, "ipaddress"):
-            record.ipaddress = "unknown_ip"
-        return super().format(record)
+        record.message = record.getMessage()
+        s = (f"[{record.levelname}] "
+             f"[{getattr(record, 'hostname', 'unknown_host')}/{getattr(record, 'ipaddress', 'unknown_ip')}] "
+             f"[{record.module}:{record.funcName}:{record.lineno}] {record.message}")
+        # Same exception/stack handling as logging.Formatter.format.
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            s = f"{s}\n{record.exc_text}"
+        if record.stack_info:
+            s = f"{s}\n{self.formatStack(record.stack_info)}"
+        return s
 
 def set_log_level(level):
     """
@@ -54,19 +82,80 @@ print("logger_config.py executed")
 # Configure logging
 # noinspection SpellCheckingInspection
 # --- Logging setup ---
-formatter = SafeFormatter("[%(levelname)s] [%(hostname)s/%(ipaddress)s] [%(module)s:%(funcName)s:%(lineno)d] %(message)s")
+formatter = SafeFormatter()
 
 handler = logging.StreamHandler(sys.stdout)
 handler.setFormatter(formatter)
 
-logging.basicConfig(level=logging.INFO, handlers=[handler])
-
 hostname_filter = HostnameFilter()
-logging.getLogger().addFilter(hostname_filter)  # Apply filter to base logger
-logging.getLogger("job_manager_logger").addFilter(hostname_filter)  # Also the custom logger
 
-# Apply to uvicorn loggers too
-logging.getLogger("uvicorn.access").addFilter(hostname_filter)
-logging.getLogger("uvicorn.error").addFilter(hostname_filter)
+_CONFIGURED = False
+_listener = None
+_queue_handler = None
+
+
+def _install_record_factory():
+    """
+    Stamp hostname/ipaddress onto each LogRecord when it is created, instead of
+    running a filter on every logger the record passes through. Values come
+    from `hostname_filter`'s thread-local state, so set_hostname() and
+    set_ipaddress() keep working per request.
+    """
+    base_factory = logging.getLogRecordFactory()
+    local = hostname_filter.local
+
+    def record_factory(*args, **kwargs):
+        record = base_factory(*args, **kwargs)
+        record.hostname = getattr(local, "hostname", "hostname_unknown")
+        record.ipaddress = getattr(local, "ipaddress", "ipaddress_unknown")
+        return record
+
+    logging.setLogRecordFactory(record_factory)
+
+
+def _log_directly_in_child():
+    """
+    After fork the child has no listener thread, so anything it enqueued would
+    never be written. Forked workers also commonly exit via os._exit (skipping
+    atexit), so rather than starting a new listener the child swaps the queue
+    handler for `handler` and writes synchronously.
+    """
+    root = logging.getLogger()
+    if _queue_handler is not None and _queue_handler in root.handlers:
+        root.removeHandler(_queue_handler)
+        root.addHandler(handler)
+
+
+def configure_once():
+    """
+    Install the handler and hostname record factory exactly once per process.
+    Repeated calls (re-imports, consumers calling it defensively) are no-ops,
+    so the factory never gets stacked and records are not emitted twice.
+    """
+    global _CONFIGURED, _listener, _queue_handler
+    if _CONFIGURED:
+        return
+    _CONFIGURED = True
+
+    # Loggers only enqueue; a background listener thread does the formatting
+    # and the stdout write, so a slow or blocked stdout never stalls a request
+    # or a DB transaction that happens to log.
+    log_queue = queue.Queue(-1)
+    _queue_handler = queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Only merge msg % args on the way in; the real layout is applied by
+    # `handler` on the listener side. (basicConfig would otherwise put its
+    # default "LEVEL:name:" format on the queue handler.)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_log_directly_in_child)
+
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+    _install_record_factory()
+
+
+configure_once()
 
 logger = logging.getLogger("job_manager_logger")
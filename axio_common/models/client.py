@@ -1,14 +1,15 @@
 import uuid
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime, timezone
 from sqlalchemy import Column, Index, String, Boolean, DateTime, Float, Integer, JSON
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
 from typing import Optional, Union, List
 
 from axio_common.database import Base
 from axio_common.logger import logger
-from axio_common.utils.model_utils import current_time
+from axio_common.utils.model_utils import json_dumps
 
 
 class ClientResponse(BaseModel):
@@ -26,8 +27,7 @@ class ClientResponse(BaseModel):
     max_jobs: Optional[int] = None
     gpu_stats: Optional[dict] = None
 
-    class Config:
-        from_attributes = True  # Enables SQLAlchemy model compatibility
+    model_config = ConfigDict(from_attributes=True)  # Enables SQLAlchemy model compatibility
 
 
 class ClientMaxJobsRequest(BaseModel):
@@ -51,8 +51,10 @@ class Client(Base):
     ip_address = Column(String, nullable=False)
     daemon = Column(Boolean, nullable=False, default=True)
     status = Column(String, nullable=False, default="active", index=True)
-    created_at = Column(DateTime(timezone=True), nullable=False, default=current_time)
-    updated_at = Column(DateTime(timezone=True), nullable=False, default=current_time, onupdate=current_time)
+    # Stamped by the database (now() inline in the INSERT/UPDATE) rather than
+    # bound from Python on every write.
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     completed_jobs = Column(Integer, default=0)
     total_duration = Column(Float, default=0.0)
     active_jobs = Column(Integer, default=0)
@@ -67,6 +69,9 @@ class Client(Base):
     # util_pct}. Freshness is the client's updated_at.
     gpu_stats = Column(JSON, nullable=True)
 
+    # The mutators below commit by default. Pass commit=False to batch several
+    # changes into the caller's single commit (see resolve_hostname).
+
     def __init__(self, hostname: Optional[str], ip_address: str, daemon: bool):
         """
         Initialize a new client object.
@@ -78,85 +83,97 @@ class Client(Base):
         Update the hostname of the client.
         """
         if self.hostname != hostname:
-            logger.info(f"Updating hostname for client {self.hostname} -> {hostname}")
+            logger.info("Updating hostname for client %s -> %s", self.hostname, hostname)
             self.hostname = hostname
 
-    def update_ip(self, ip_address: str, db: Session):
+    def update_ip(self, ip_address: str, db: Session, commit: bool = True):
         """
         Update the IP address of the client.
         """
         if self.ip_address != ip_address:
-            logger.info(f"Updating IP address for client {self.hostname} -> {ip_address}")
+            logger.info("Updating IP address for client %s -> %s", self.hostname, ip_address)
             self.ip_address = ip_address
-            db.commit()
+            if commit:
+                db.commit()
 
-    def mark_active(self, db: Session):
+    def mark_active(self, db: Session, commit: bool = True):
         """
         Mark the client as active.
         """
-        prev_status = self.status
-        self.status = "active"
-        logger.info(f"Marking status for client {self.hostname}: {prev_status} -> {self.status}")
-        db.commit()
+        if self.status != "active":  # already active; don't dirty the row
+            prev_status = self.status
+            self.status = "active"
+            logger.info("Marking status for client %s: %s -> %s", self.hostname, prev_status, self.status)
+        # Commit either way: writes the caller staged earlier may already have
+        # been autoflushed, so db.dirty can't tell whether there is work.
+        if commit:
+            db.commit()
 
-    def mark_inactive(self, db: Session):
+    def mark_inactive(self, db: Session, commit: bool = True):
         """
         Mark the client as inactive.
         """
         prev_status = self.status
         self.status = "inactive"
-        logger.info(f"Marking status for client {self.hostname}: {prev_status} -> {self.status}")
-        db.commit()
+        logger.info("Marking status for client %s: %s -> %s", self.hostname, prev_status, self.status)
+        if commit:
+            db.commit()
 
-    def update_status(self, status: str, db: Session):
+    def update_status(self, status: str, db: Session, commit: bool = True):
         """
         Update the status of the client.
         """
         if self.status != status:
-            logger.info(f"Updating status for client {self.hostname} -> {status}")
+            logger.info("Updating status for client %s -> %s", self.hostname, status)
             self.status = status
-            db.commit()
+            if commit:
+                db.commit()
 
-    def update_daemon(self, daemon: bool, db: Session):
+    def update_daemon(self, daemon: bool, db: Session, commit: bool = True):
         """
         Update the daemon status of the client.
         """
         if self.daemon != daemon:
-            logger.info(f"Updating daemon status for client {self.hostname} -> {daemon}")
+            logger.info("Updating daemon status for client %s -> %s", self.hostname, daemon)
             self.daemon = daemon
-            db.commit()
+            if commit:
+                db.commit()
 
-    def shutdown_daemon(self, db: Session):
+    def shutdown_daemon(self, db: Session, commit: bool = True):
         """
         Mark the client daemon as shutting down.
         """
-        logger.info(f"Shutting down daemon for client {self.hostname}")
+        logger.info("Shutting down daemon for client %s", self.hostname)
         self.status = "shutting_down"
-        db.commit()
+        if commit:
+            db.commit()
 
     def shutdown_job(self, job_id: str, db: Session):
         """
         Shutdown a specific job on the client and log the action.
         """
         from axio_common.utils.shared import update_job_status
-        logger.info(f"Job {job_id} on {self.hostname} is shutting down.")
+        logger.info("Job %s on %s is shutting down.", job_id, self.hostname)
         update_job_status(job_id, "shutting_down", db)
 
-    def update_job_tracking(self, new_job: bool, duration: float, db: Session):
+    def update_job_tracking(self, new_job: bool, duration: float, db: Session, commit: bool = True):
         if new_job:
             self.active_jobs += 1
         else:
             self.total_duration += duration
-        db.commit()
+        if commit:
+            db.commit()
 
-    def complete_job(self, db: Session):
+    def complete_job(self, db: Session, commit: bool = True):
         self.active_jobs = max(0, self.active_jobs - 1)
         self.completed_jobs +=1
-        db.commit()
+        if commit:
+            db.commit()
 
-    def remove_active_job(self, db: Session):
+    def remove_active_job(self, db: Session, commit: bool = True):
         self.active_jobs = max(0, self.active_jobs - 1)
-        db.commit()
+        if commit:
+            db.commit()
 
     def to_dict(self):
         return {
@@ -175,16 +192,25 @@ class Client(Base):
             "gpu_stats": self.gpu_stats,
         }
 
-    def set_max_jobs(self, max_jobs: Optional[int], db: Session):
+    def to_json(self) -> bytes:
+        """
+        Serialize to_dict() straight to JSON bytes (orjson when available), so
+        endpoints can return the body without re-validating through ClientResponse.
+        """
+        return json_dumps(self.to_dict())
+
+    def set_max_jobs(self, max_jobs: Optional[int], db: Session, commit: bool = True):
         """Set (or clear, when None) the dashboard concurrency-cap override."""
         self.max_jobs = None if max_jobs is None else max(0, int(max_jobs))
-        logger.info(f"Client {self.hostname} max_jobs set to {self.max_jobs}")
-        db.commit()
+        logger.info("Client %s max_jobs set to %s", self.hostname, self.max_jobs)
+        if commit:
+            db.commit()
 
-    def set_gpu_stats(self, gpu_stats, db: Session):
+    def set_gpu_stats(self, gpu_stats, db: Session, commit: bool = True):
         """Store the latest training-GPU telemetry reported by the daemon."""
         self.gpu_stats = gpu_stats
-        db.commit()
+        if commit:
+            db.commit()
 
     @classmethod
     def from_dict(cls, data):
@@ -192,8 +218,7 @@ class Client(Base):
         Create a Client object from a dictionary.
         Filters out unexpected keys to prevent errors.
         """
-        valid_keys = {column.name for column in cls.__table__.columns}
-        filtered_data = {key: value for key, value in data.items() if key in valid_keys}
+        filtered_data = {key: value for key, value in data.items() if key in cls._COLUMN_NAMES}
 
         # Extract initialization data
         hostname = filtered_data.pop("hostname", None)
@@ -205,7 +230,7 @@ class Client(Base):
             client = cls(hostname, ip_address, daemon)
             client.update_from_dict(filtered_data)
         except Exception as e:
-            logger.error(f"Error creating client from dict: {e}")
+            logger.error("Error creating client from dict: %s", e)
             return None
 
         return client
@@ -216,7 +241,7 @@ class Client(Base):
         Ensures `None` values don't overwrite existing values.
         """
         for key, value in data.items():
-            if key in self.to_dict() and value is not None:
+            if value is not None and key in self._COLUMN_NAMES:
                 setattr(self, key, value)
 
 
@@ -1,12 +1,14 @@
+import logging
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy import Column, Index, String, TEXT, DateTime, Integer, JSON, BigInteger
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, relationship
 
 from axio_common.database import Base
 from axio_common.logger import logger
-from axio_common.utils.model_utils import current_time
+from axio_common.utils.model_utils import current_time, json_dumps
 
 TYPE_ID_NAME_MAP = {
     "01": "(Deprecated) Small Force Plate",
@@ -31,6 +33,34 @@ TYPE_ID_NAME_MAP = {
     "af": "Axiocell",
 }
 
+_BEST_ACTIVITY = "TE-all"
+_BEST_METRIC = "mae"
+
+
+def _compare_to_best(test_metrics, best_run, best_metrics, axis):
+    """
+    Return (new_value, best_value) for one model head. best_value is None when
+    there is no usable previous best (no run yet, or its metrics lack both the
+    activity block and the legacy "all" block).
+    """
+    new_value = test_metrics[_BEST_ACTIVITY][_BEST_METRIC][axis]
+    if not best_run or not best_metrics:
+        return new_value, None
+    if _BEST_ACTIVITY in best_metrics:
+        block = best_metrics[_BEST_ACTIVITY]
+    elif "all" in best_metrics:
+        block = best_metrics["all"]
+    else:
+        return new_value, None
+    return new_value, block[_BEST_METRIC][axis]
+
+
+def _type_fields(axf_id: str, name: Optional[str] = None) -> dict:
+    """type_id / type_name / name derived from an axf_id, as Device.__init__ sets them."""
+    type_id = axf_id.partition(".")[0]
+    type_name = TYPE_ID_NAME_MAP.get(type_id, "Unknown Device")
+    return {"type_id": type_id, "type_name": type_name, "name": name or type_name}
+
 
 class DeviceResponse(BaseModel):
     axf_id: str
@@ -38,8 +68,8 @@ class DeviceResponse(BaseModel):
     type_id: str = None
     type_name: str = None
     device_metadata: Optional[dict] = None  # Additional data about the device
-    created_at: datetime = current_time()
-    updated_at: datetime = current_time()
+    created_at: datetime = Field(default_factory=current_time)
+    updated_at: datetime = Field(default_factory=current_time)
     # Date/time the device was physically assembled. Set from the local
     # AxioforceDynamoPy "Initialize" click; nullable for devices that pre-date
     # this field. assembled_date_history is an append-only audit list of
@@ -61,8 +91,7 @@ class DeviceResponse(BaseModel):
     anomaly_warning: Optional[int] = 0
     anomaly_details: Optional[list] = None
 
-    class Config:
-        from_attributes = True  # Enables SQLAlchemy model compatibility
+    model_config = ConfigDict(from_attributes=True)  # Enables SQLAlchemy model compatibility
 
 
 class Device(Base):
@@ -103,71 +132,61 @@ class Device(Base):
         """
         Initialize a new device object.
         """
-        super().__init__(axf_id=axf_id, name=name)
-        self.type_id = axf_id.split(".")[0]
-        self.name = name or TYPE_ID_NAME_MAP.get(self.type_id, "Unknown Device")
-        self.type_name = TYPE_ID_NAME_MAP.get(self.type_id, "Unknown Device")
-        logger.info(f"Device {axf_id} created, type: {self.type_name}")
+        super().__init__(axf_id=axf_id, **_type_fields(axf_id, name))
+        logger.debug("Device %s created, type: %s", axf_id, self.type_name)
 
     def update_best_metrics(self, update, run_number, job):
         """
         Update the best metrics for the device.
         """
-        train_metrics = update.train_metrics
-        val_metrics = update.val_metrics
-        test_metrics = update.test_metrics
-
-        activity = "TE-all"
-        metric = "mae"
-
         if job.model_type == "force":
-            best_run_attr = "best_force_run"
-            best_metrics_attr = "best_force_test_metrics"
-            axis = -1  # Use the z axis
-        elif job.model_type == "moment":
-            best_run_attr = "best_moment_run"
-            best_metrics_attr = "best_moment_test_metrics"
-            axis = 0  # Use the x axis
-        else:
-            logger.warning(f"Unknown model type '{job.model_type}' for device {self.axf_id}")
+            return self._update_force_metrics(update, run_number, job)
+        if job.model_type == "moment":
+            return self._update_moment_metrics(update, run_number, job)
+        logger.warning("Unknown model type '%s' for device %s", job.model_type, self.axf_id)
+
+    def _update_force_metrics(self, update, run_number, job):
+        # Force heads are ranked on the z axis.
+        new_value, best_value = _compare_to_best(
+            update.test_metrics, self.best_force_run, self.best_force_test_metrics, -1)
+        if best_value is not None and new_value >= best_value:
+            logger.info("Run %s did not improve %s metrics for device %s", run_number, job.model_type, self.axf_id)
             return
-
-        best_run = getattr(self, best_run_attr, None)
-        best_metrics = getattr(self, best_metrics_attr, {})
-
-        if best_metrics is None:
-            best_metrics = {}
-
-        # Handle missing activity key
-        if activity not in best_metrics:
-            if "all" in best_metrics:
-                best_metrics[activity] = best_metrics["all"]
-            else:
-                best_run = None  # Reset best run if no metrics exist
-
-        # Determine if the new test metric is better
-        new_metric_value = test_metrics[activity][metric][axis]
-        best_metric_value = best_metrics[activity][metric][axis] if best_run else float("inf")
-
-        if best_run is None or new_metric_value < best_metric_value:
-            if best_run is not None:
-                logger.info(
-                    f"Device {self.axf_id} best {job.model_type} metrics updated: {job.timestamp}/{run_number} "
-                    f"({new_metric_value:.4f} < {best_metric_value:.4f})"
-                )
-            else:
-                logger.info(
-                    f"Device {self.axf_id} best {job.model_type} metrics updated: {job.timestamp}/{run_number} "
-                    f"({new_metric_value:.4f})"
-                )
-
-            setattr(self, best_run_attr, run_number)
-            setattr(self, best_metrics_attr, test_metrics)
-            setattr(self, f"best_{job.model_type}_timestamp", job.timestamp)
-            setattr(self, f"best_{job.model_type}_train_metrics", train_metrics)
-            setattr(self, f"best_{job.model_type}_val_metrics", val_metrics)
+        self._log_best_update(job, run_number, new_value, best_value)
+        self.best_force_run = run_number
+        self.best_force_test_metrics = update.test_metrics
+        self.best_force_timestamp = job.timestamp
+        self.best_force_train_metrics = update.train_metrics
+        self.best_force_val_metrics = update.val_metrics
+
+    def _update_moment_metrics(self, update, run_number, job):
+        # Moment heads are ranked on the x axis.
+        new_value, best_value = _compare_to_best(
+            update.test_metrics, self.best_moment_run, self.best_moment_test_metrics, 0)
+        if best_value is not None and new_value >= best_value:
+            logger.info("Run %s did not improve %s metrics for device %s", run_number, job.model_type, self.axf_id)
+            return
+        self._log_best_update(job, run_number, new_value, best_value)
+        self.best_moment_run = run_number
+        self.best_moment_test_metrics = update.test_metrics
+        self.best_moment_timestamp = job.timestamp
+        self.best_moment_train_metrics = update.train_metrics
+        self.best_moment_val_metrics = update.val_metrics
+
+    def _log_best_update(self, job, run_number, new_value, best_value):
+        # Skip building the argument tuple entirely when INFO is filtered out.
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        if best_value is not None:
+            logger.info(
+                "Device %s best %s metrics updated: %s/%s (%.4f < %.4f)",
+                self.axf_id, job.model_type, job.timestamp, run_number, new_value, best_value,
+            )
         else:
-            logger.info(f"Run {run_number} did not improve {job.model_type} metrics for device {self.axf_id}")
+            logger.info(
+                "Device %s best %s metrics updated: %s/%s (%.4f)",
+                self.axf_id, job.model_type, job.timestamp, run_number, new_value,
+            )
 
     def recompute_best_metrics(self, db):
         """
@@ -217,8 +236,8 @@ class Device(Base):
                 setattr(self, f"best_{model_type}_train_metrics", None)
                 setattr(self, f"best_{model_type}_val_metrics", None)
                 setattr(self, f"best_{model_type}_test_metrics", None)
-                logger.info(f"Device {self.axf_id} best {model_type} metrics cleared "
-                            f"(no surviving run with {activity} {metric}).")
+                logger.info("Device %s best %s metrics cleared (no surviving run with %s %s).",
+                            self.axf_id, model_type, activity, metric)
                 continue
 
             setattr(self, f"best_{model_type}_run", best_run.number)
@@ -226,8 +245,8 @@ class Device(Base):
             setattr(self, f"best_{model_type}_train_metrics", best_run.train_metrics)
             setattr(self, f"best_{model_type}_val_metrics", best_run.val_metrics)
             setattr(self, f"best_{model_type}_test_metrics", best_run.test_metrics)
-            logger.info(f"Device {self.axf_id} best {model_type} metrics recomputed: "
-                        f"{best_run.job.timestamp}/{best_run.number} ({best_value:.4f}).")
+            logger.info("Device %s best %s metrics recomputed: %s/%s (%.4f).",
+                        self.axf_id, model_type, best_run.job.timestamp, best_run.number, best_value)
 
     def to_dict(self):
         """
@@ -258,14 +277,20 @@ class Device(Base):
             "anomaly_details": self.anomaly_details,
         }
 
+    def to_json(self) -> bytes:
+        """
+        Serialize to_dict() straight to JSON bytes (orjson when available), so
+        API/Firebase callers don't need a separate encoding pass.
+        """
+        return json_dumps(self.to_dict())
+
     @classmethod
     def from_dict(cls, data):
         """
         Create a Device object from a dictionary.
         Ensures required fields are present and assigns sensible defaults.
         """
-        valid_keys = {column.name for column in cls.__table__.columns}
-        filtered_data = {key: value for key, value in data.items() if key in valid_keys}
+        filtered_data = {key: value for key, value in data.items() if key in cls._COLUMN_NAMES}
 
         # Extract axf_id separately, since __init__ only accepts that
         axf_id = filtered_data.pop("axf_id", None)
@@ -281,6 +306,56 @@ class Device(Base):
 
         return device
 
+    @classmethod
+    def bulk_from_dicts(cls, db, rows):
+        """
+        Insert many devices from dictionaries in one executemany, bypassing
+        per-instance __init__/attribute instrumentation. Unknown keys are
+        dropped; type_id/type_name/name are derived from axf_id when absent,
+        as __init__ would. Does not commit.
+        """
+        mappings = []
+        for row in rows:
+            data = {key: value for key, value in row.items() if key in cls._COLUMN_NAMES}
+            if data.get("axf_id") is None:
+                raise ValueError("Device must have an axf_id")
+            for key, value in _type_fields(data["axf_id"], data.get("name")).items():
+                if data.get(key) is None:
+                    data[key] = value
+            mappings.append(data)
+        db.bulk_insert_mappings(cls, mappings)
+
+    @classmethod
+    def get_or_create(cls, db: Session, axf_id: str, name: Optional[str] = None):
+        """
+        Return the device, inserting it first if it doesn't exist. Existing
+        devices (the common case) are a primary-key get, which is free when the
+        device is already in the session. On a miss, Postgres inserts with a
+        single INSERT ... ON CONFLICT DO UPDATE ... RETURNING, so two
+        submissions for a new device can't race into a duplicate-key error;
+        other backends fall back to a plain insert. Does not commit.
+        """
+        device = db.get(cls, axf_id)
+        if device is not None:
+            return device
+        if db.get_bind().dialect.name != "postgresql":
+            device = cls(axf_id, name)
+            db.add(device)
+            db.flush()
+            return device
+        return db.scalars(cls._upsert_stmt(axf_id, name), execution_options={"populate_existing": True}).one()
+
+    @classmethod
+    def _upsert_stmt(cls, axf_id: str, name: Optional[str] = None):
+        # The no-op SET (rather than DO NOTHING) makes RETURNING yield the row
+        # a concurrent insert won with, too.
+        return (
+            pg_insert(cls)
+            .values(axf_id=axf_id, **_type_fields(axf_id, name))
+            .on_conflict_do_update(index_elements=[cls.axf_id], set_={"axf_id": axf_id})
+            .returning(cls)
+        )
+
     def best_metrics(self):
         """
         Return the best metrics for the device.
@@ -308,9 +383,10 @@ class Device(Base):
         Update the device object from a server response.
         """
         for key, value in device.items():
-            if key in self.to_dict() and value is not None:
+            if value is not None and key in self._COLUMN_NAMES:
                 setattr(self, key, value)
 
+
 class BestDeviceMetricsResponse(BaseModel):
     axf_id: str
     force: dict
@@ -1,7 +1,7 @@
-import json
+import time
 import uuid
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from typing import Optional, List
 
@@ -11,13 +11,17 @@ from sqlalchemy.orm import Session, relationship
 
 from axio_common.database import Base
 from axio_common.logger import logger
-from axio_common.utils.model_utils import current_time
+from axio_common.utils.model_utils import current_time, json_dumps, json_loads
 
 
 # Number of failures (transitions back to "queued" after assignment) before a
 # job is pushed to the back of its priority tier. Lower = more aggressive.
 RETRY_PUSHBACK_THRESHOLD = 1
 
+# Standalone heartbeats arriving within this many seconds of the previous one
+# don't rewrite last_heartbeat.
+HEARTBEAT_COALESCE_SECONDS = 1.0
+
 
 class UpdateJobProgressRequest(BaseModel):
     job_id: str
@@ -71,9 +75,10 @@ class JobResponse(BaseModel):
     allowed_hostnames: Optional[List[str]] = None
     live_progress: Optional[dict] = None
     failure_reason: Optional[str] = None
+    best_run_id: Optional[str] = None
+    best_test_mae: Optional[float] = None
 
-    class Config:
-        from_attributes = True  # Enables SQLAlchemy model compatibility
+    model_config = ConfigDict(from_attributes=True)  # Enables SQLAlchemy model compatibility
 
 
 class Job(Base):
@@ -136,12 +141,18 @@ class Job(Base):
     # rollouts/dogfooding ("send this job specifically to my dev box").
     allowed_hostnames = Column(ARRAY(String), nullable=True)
 
+    # Pointer to the job's current best run and its TE-all MAE, maintained by
+    # Run.complete so a completion can compare against it without querying
+    # runs. NULL until the first run completes (or for jobs that predate it).
+    best_run_id = Column(String, nullable=True)
+    best_test_mae = Column(Float, nullable=True)
+
     # Relationships
     device = relationship("Device", back_populates="jobs", lazy="select")
     runs = relationship("Run", back_populates="job", lazy="select", cascade="all, delete-orphan")
 
     def update_model_type(self):
-        config = json.loads(self.config)
+        config = json_loads(self.config)
         self.model_type = config["OUTPUT_TYPE"].split()[0]
 
     def update_status(self, status: str, db: Session, hostname: str = None,
@@ -155,14 +166,25 @@ class Job(Base):
         interrupted, requeued, and is now running again still shows why it was
         requeued; the next failure overwrites it.
         """
+        # Repeating the current status (e.g. a worker re-reporting "running")
+        # with nothing new to record is a no-op: no log line, no assignments.
+        # Still commit: the caller may have staged other writes expecting this
+        # call to commit them, and those may already be autoflushed (so no
+        # longer in db.dirty) by the query that loaded the job.
+        if (status == self.status and (not hostname or hostname == self.hostname)
+                and not (reason and status in ("failed", "interrupted"))):
+            db.commit()
+            return
+
         prior_status = self.status
-        logger.info(f"Job {self.id} status updated: {prior_status} -> {status}")
+        logger.info("Job %s status updated: %s -> %s", self.id, prior_status, status)
         self.status = status
         if status in ("failed", "interrupted") and reason:
             self.failure_reason = str(reason)[:2000]
         if status == "assigned":
             self.assigned_at = current_time()
-            self.heartbeat(db)
+            self._assigned_mark = (self.assigned_at, time.monotonic_ns())
+            self.heartbeat(db, commit=False)
         elif status == "completed":
             self.completed_at = current_time()
         elif status == "interrupted":
@@ -176,7 +198,7 @@ class Job(Base):
                 # lookup so a decommissioned/renamed host can't break the requeue.
                 client = client_by_hostname(self.hostname, db, update_activity=False)
                 if client:
-                    client.remove_active_job(db)
+                    client.remove_active_job(db, commit=False)
         elif status == "queued" and prior_status not in ("queued", None):
             # Requeue after an assignment (interrupted, missed heartbeat, etc.).
             # Bump the failure counter; once it crosses the threshold, push the
@@ -185,68 +207,81 @@ class Job(Base):
             if self.failure_count >= RETRY_PUSHBACK_THRESHOLD:
                 self.queued_at = current_time()
                 logger.info(
-                    f"Job {self.id} pushed to back of queue "
-                    f"(failure_count={self.failure_count}, priority={self.priority})"
+                    "Job %s pushed to back of queue (failure_count=%s, priority=%s)",
+                    self.id, self.failure_count, self.priority,
                 )
 
         if hostname:
-            logger.info(f"Job {self.id} assigned to {hostname}")
+            logger.info("Job %s assigned to %s", self.id, hostname)
             self.hostname = hostname
-        db.commit()
 
         # Deleting a job must not leave one of its runs frozen as a device's
         # best model. The device best_* pointer is monotonic and never
         # re-evaluates on deletion, so recompute it from the surviving
-        # (non-deleted) runs whenever a job is deleted.
+        # (non-deleted) runs whenever a job is deleted. Flush explicitly so the
+        # run query sees the new status even if the caller's session has
+        # autoflush off; this still shares the single commit.
         if status == "deleted" and self.device_axf_id:
             from axio_common.models import Device
-            device = db.query(Device).filter(Device.axf_id == self.device_axf_id).first()
+            device = db.get(Device, self.device_axf_id)
             if device:
+                db.flush()
                 device.recompute_best_metrics(db)
-                db.commit()
+        db.commit()
 
     def start_run(self, run_config: dict, run_number: int):
         """
         Start a new run, updating the progress and initializing run_progress.
         """
         from axio_common.models import Run
-        logger.info(f"Job {self.id} starting run {run_number}")
+        logger.info("Job %s starting run %s", self.id, run_number)
         self.run_number = run_number
         if run_number == 1:
             self.started_at = current_time()
             self.status = "running"
-            logger.info(f"Job {self.id} began first run - status updated to 'running'")
+            logger.info("Job %s began first run - status updated to 'running'", self.id)
 
         if self.status == "assigned":
             self.status = "running"
-            logger.info(f"New run starting on Job {self.id} - status updated from 'assigned' to 'running'")
+            logger.info("New run starting on Job %s - status updated from 'assigned' to 'running'", self.id)
 
         run = Run(job_id=self.id, number=run_number)
         run.initialize_from_config(run_config)
         run.is_current = True
         self.run_started_at = current_time()
+        self._current_run = run
         return run
 
+    def _find_current_run(self, db: Session):
+        """
+        The job's current Run. Reuses the one this instance started (if it is
+        still current) before falling back to the indexed (job_id, is_current)
+        lookup, which is the path taken when the job was loaded fresh.
+        """
+        from axio_common.models import Run
+        run = getattr(self, "_current_run", None)
+        if run is not None and run.is_current:
+            return run
+        return db.query(Run).filter(Run.job_id == self.id, Run.is_current).first()
+
     def update_progress(self, update: UpdateJobProgressRequest, db: Session):
         """
         Update the progress of the job and log the change.
         """
-        from axio_common.models import Run
-        logger.info(f"Job {self.id} progress updated: Run {self.run_number} -> {update.run_number}")
+        logger.info("Job %s progress updated: Run %s -> %s", self.id, self.run_number, update.run_number)
         self.run_number = update.run_number
         self.total_runs = update.total_runs
 
         # Check to see if any runs are "current"
-        current_run = db.query(Run).filter(Run.job_id == self.id, Run.is_current).first()
+        current_run = self._find_current_run(db)
         if current_run:
             current_run.is_current = False
-            logger.info(f"Run {current_run.number} marked as not current")
+            logger.info("Run %s marked as not current", current_run.number)
 
         # Create a new run and set it as current
         run = self.start_run(update.run_config, update.run_number)
         db.add(run)
         db.commit()
-        db.refresh(run)
 
     # Cap on the per-run loss sparkline kept in live_progress. Worker pings are
     # throttled (~10s + edges), so ~120 points comfortably covers a run while
@@ -295,16 +330,15 @@ class Job(Base):
         """
         Complete the current run and log the results.
         """
-        from axio_common.models import Run
-        logger.info(f"Job {self.id} run {update.run_number} completed")
-        run = db.query(Run).filter(Run.job_id == self.id, Run.is_current).first()
+        logger.info("Job %s run %s completed", self.id, update.run_number)
+        run = self._find_current_run(db)
         if not run:
-            logger.error(f"No current run found for job {self.id}")
+            logger.error("No current run found for job %s", self.id)
             return
 
         run.complete(self, update, db)
 
-        self.duration = (run.completed_at - self.assigned_at).total_seconds()
+        self.duration = self._seconds_since_assigned(run.completed_at)
 
         db.commit()
         return run
@@ -313,19 +347,41 @@ class Job(Base):
         """
         Mark the job as completed and log the results.
         """
-        logger.info(f"Job {self.id} completed")
+        logger.info("Job %s completed", self.id)
         self.completed_at = current_time()
-        self.duration = (self.completed_at - self.assigned_at).total_seconds()
+        self.duration = self._seconds_since_assigned(self.completed_at)
         db.commit()
 
-    def heartbeat(self, db: Session):
+    def heartbeat(self, db: Session, commit: bool = True):
         """
         Update the timestamp of the last heartbeat.
+
+        Pass commit=False when calling from inside another transition (e.g.
+        update_status) so the caller's single commit covers both. Standalone
+        heartbeats within HEARTBEAT_COALESCE_SECONDS of the last one are skipped.
         """
-        self.last_heartbeat = current_time()
-        self.duration = (self.last_heartbeat - self.assigned_at).total_seconds() if self.assigned_at else 0
-        logger.info(f"Heartbeat updated for job {self.id}")
-        db.commit()
+        now = current_time()
+        if (commit and self.last_heartbeat is not None
+                and (now - self.last_heartbeat).total_seconds() < HEARTBEAT_COALESCE_SECONDS):
+            db.commit()  # nothing to write, but commit what the caller staged
+            return
+        self.last_heartbeat = now
+        self.duration = self._seconds_since_assigned(self.last_heartbeat) if self.assigned_at else 0
+        logger.info("Heartbeat updated for job %s", self.id)
+        if commit:
+            db.commit()
+
+    def _seconds_since_assigned(self, now):
+        """
+        Seconds between assignment and `now`. If this same instance recorded the
+        assignment (and assigned_at hasn't changed since), use the monotonic
+        clock, which is immune to NTP steps; otherwise -- the usual case, since
+        each request reloads the job -- fall back to wall-clock subtraction.
+        """
+        mark = getattr(self, "_assigned_mark", None)
+        if mark is not None and mark[0] == self.assigned_at:
+            return (time.monotonic_ns() - mark[1]) / 1e9
+        return (now - self.assigned_at).total_seconds()
 
     def get_best_run(self, db):
         """
@@ -334,7 +390,7 @@ class Job(Base):
         from axio_common.models import Run
         best_run = db.query(Run).filter(Run.job_id == self.id, Run.is_best).first()
         if not best_run:
-            logger.warning(f"No best run found for job {self.id}")
+            logger.warning("No best run found for job %s", self.id)
             return None
         return best_run
 
@@ -389,29 +445,48 @@ class Job(Base):
             "allowed_hostnames": list(self.allowed_hostnames) if self.allowed_hostnames else None,
             "live_progress": self.live_progress,
             "failure_reason": self.failure_reason,
+            "best_run_id": self.best_run_id,
+            "best_test_mae": self.best_test_mae,
         }
 
+    def to_json(self) -> bytes:
+        """
+        Serialize to_dict() straight to JSON bytes (orjson when available), so
+        API callers don't need a separate encoding pass.
+        """
+        return json_dumps(self.to_dict())
+
     @classmethod
     def from_dict(cls, data):
         """
         Create a Job object from a dictionary.
         Filters out unexpected keys to prevent errors.
         """
-        valid_keys = {column.name for column in cls.__table__.columns}
-        filtered_data = {key: value for key, value in data.items() if key in valid_keys}
+        filtered_data = {key: value for key, value in data.items() if key in cls._COLUMN_NAMES}
         if len(filtered_data) != len(data):
-            invalid_keys = set(data) - valid_keys
-            logger.warning(f"Invalid keys: {invalid_keys}")
+            invalid_keys = set(data) - cls._COLUMN_NAMES
+            logger.warning("Invalid keys: %s", invalid_keys)
 
         return cls(**filtered_data)
 
+    @classmethod
+    def bulk_from_dicts(cls, db: Session, rows):
+        """
+        Insert many jobs from dictionaries in one executemany, bypassing
+        per-instance construction and attribute instrumentation. Unknown keys
+        are dropped. Does not commit.
+        """
+        db.bulk_insert_mappings(
+            cls, [{key: value for key, value in row.items() if key in cls._COLUMN_NAMES} for row in rows]
+        )
+
     def update_from_dict(self, data):
         """
         Update the Job object from a dictionary.
         Ensures `None` values don't overwrite existing values.
         """
         for key, value in data.items():
-            if key in self.to_dict() and value is not None:
+            if value is not None and key in self._COLUMN_NAMES:
                 setattr(self, key, value)
 
 
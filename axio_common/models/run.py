@@ -1,15 +1,23 @@
-import json
 import uuid
 from datetime import datetime
 from typing import Optional, List
 
-from pydantic import BaseModel
-from sqlalchemy import Column, String, ForeignKey, Index, Integer, Float, DateTime, Boolean, JSON
-from sqlalchemy.orm import Session, relationship
+from pydantic import BaseModel, ConfigDict, TypeAdapter, field_validator
+from sqlalchemy import Column, Computed, String, ForeignKey, Index, Integer, Float, DateTime, Boolean, JSON
+from sqlalchemy import insert, update as update_stmt
+from sqlalchemy.orm import Session, defer, relationship
+from sqlalchemy.sql import func
 
 from axio_common.database import Base
 from axio_common.logger import logger
-from axio_common.utils.model_utils import current_time
+from axio_common.utils.model_utils import current_time, json_dumps, json_loads
+
+
+def _decode_layers(value):
+    # Rows written before layers was stored natively hold a JSON-encoded string.
+    if isinstance(value, str):
+        return json_loads(value)
+    return value
 
 
 class CompleteRunRequest(BaseModel):
@@ -22,13 +30,14 @@ class CompleteRunRequest(BaseModel):
     hostname: str
 
 
-class RunResponse(BaseModel):
+class RunSummaryResponse(BaseModel):
+    """Run fields for list views: everything except the large metric JSON blobs."""
     id: str
     job_id: str
     number: int
     created_at: datetime
     updated_at: datetime
-    duration: float
+    duration: Optional[float]  # NULL until the run completes
     completed_at: Optional[datetime]
     learning_rate: Optional[float]
     activation: Optional[str]
@@ -39,12 +48,35 @@ class RunResponse(BaseModel):
     epochs_completed: int
     is_best: bool
     is_current: bool
+    test_mae: Optional[float] = None
+
+    model_config = ConfigDict(from_attributes=True)  # Enables SQLAlchemy model compatibility
+
+    @field_validator("layers", mode="before")
+    @classmethod
+    def _legacy_layers(cls, value):
+        return _decode_layers(value)
+
+
+class RunResponse(RunSummaryResponse):
     train_metrics: Optional[dict]
     val_metrics: Optional[dict]
     test_metrics: Optional[dict]
 
-    class Config:
-        from_attributes = True  # Enables SQLAlchemy model compatibility
+
+# Built once; validating and dumping a whole list through one adapter keeps the
+# per-run work in pydantic-core instead of a Python loop plus jsonable_encoder.
+_RUN_LIST_ADAPTER = TypeAdapter(List[RunResponse])
+_RUN_SUMMARY_LIST_ADAPTER = TypeAdapter(List[RunSummaryResponse])
+
+
+def runs_to_json(runs, summary: bool = False) -> bytes:
+    """
+    Serialize Run rows straight to JSON bytes as RunResponse (or
+    RunSummaryResponse when summary=True, e.g. for Run.list_summaries rows).
+    """
+    adapter = _RUN_SUMMARY_LIST_ADAPTER if summary else _RUN_LIST_ADAPTER
+    return adapter.dump_json(adapter.validate_python(runs, from_attributes=True))
 
 
 class Run(Base):
@@ -57,9 +89,13 @@ class Run(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     job_id = Column(String, ForeignKey("jobs.id"), nullable=False, index=True)
     number = Column(Integer, nullable=False)
+    # created_at stays on the app clock, same as completed_at, so duration is
+    # not skewed by app/DB clock drift. updated_at is stamped by the database.
     created_at = Column(DateTime(timezone=True), nullable=False, default=current_time)
-    updated_at = Column(DateTime(timezone=True), nullable=False, default=current_time, onupdate=current_time)
-    duration = Column(Float, default=0.0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    # Generated by Postgres from the two timestamps; NULL while the run is in
+    # progress. Never written from Python (excluded from _COLUMN_NAMES).
+    duration = Column(Float, Computed("EXTRACT(EPOCH FROM (completed_at - created_at))", persisted=True))
     completed_at = Column(DateTime(timezone=True), nullable=True)
     learning_rate = Column(Float, nullable=True)
     activation = Column(String, nullable=True)
@@ -73,6 +109,9 @@ class Run(Base):
     train_metrics = Column(JSON, nullable=True)
     val_metrics = Column(JSON, nullable=True)
     test_metrics = Column(JSON, nullable=True)
+    # TE-all MAE on the ranking axis (test_metrics["TE-all"]["mae"][-1]), copied
+    # out at completion so comparisons don't have to load and decode the JSON.
+    test_mae = Column(Float, nullable=True, index=True)
 
     # Relationships
     job = relationship("Job", back_populates="runs", lazy="select")
@@ -81,18 +120,17 @@ class Run(Base):
         self.learning_rate = run_config['learning_rate']
         self.activation = run_config['activation']
         self.optimizer = run_config['optimizer_name']
-        self.layers = json.dumps(run_config['layers'])
+        self.layers = list(run_config['layers'])
         self.batch_size = run_config['batch_size']
         self.epochs = run_config['epochs']
 
     def complete(self, job, update: CompleteRunRequest, db: Session):
         """
-        Mark the run as complete.
+        Mark the run as complete. Does not db.add() anything: the run (loaded,
+        or added by Job.update_progress) and job.device are already in the
+        session, so the caller's commit flushes these changes.
         """
-        from axio_common.models import Device
-        self.completed_at = current_time()
-        self.updated_at = current_time()
-        self.duration = (self.completed_at - self.created_at).total_seconds()
+        self.completed_at = current_time()  # duration follows via the generated column
         self.epochs_completed = update.epochs_completed
         self.is_current = False
 
@@ -100,31 +138,55 @@ class Run(Base):
         self.train_metrics = update.train_metrics
         self.val_metrics = update.val_metrics
         self.test_metrics = update.test_metrics
+        self.test_mae = update.test_metrics["TE-all"]["mae"][-1]
 
-        # Get best test metrics from the best run of the current job
-        best_run = db.query(Run).filter(Run.job_id == self.job_id, Run.is_best).first()
-        if best_run is None or update.test_metrics["TE-all"]["mae"][-1] < best_run.test_metrics["TE-all"]["mae"][-1]:
+        new_mae = self.test_mae
+        best_run_id, best_mae = self._current_best(job, db)
+        if best_run_id is None or new_mae < best_mae:
             self.is_best = True
-            if best_run is not None:
-                logger.info(f"Run {self.number} is the new best run for job {self.job_id} "
-                            f"({update.test_metrics['TE-all']['mae'][-1]:.4f} < "
-                            f"{best_run.test_metrics['TE-all']['mae'][-1]:.4f})")
-                best_run.is_best = False
+            if best_run_id is not None:
+                logger.info("Run %s is the new best run for job %s (%.4f < %.4f)",
+                            self.number, self.job_id, new_mae, best_mae)
+                # One UPDATE instead of loading the old best Run just to flip its flag.
+                db.execute(update_stmt(Run).where(Run.id == best_run_id).values(is_best=False))
             else:
-                logger.info(f"Run {self.number} is the first best run for job {self.job_id} "
-                            f"({update.test_metrics['TE-all']['mae'][-1]:.4f})")
+                logger.info("Run %s is the first best run for job %s (%.4f)",
+                            self.number, self.job_id, new_mae)
 
-            # Get the associated device and attach the best run metrics
+            # Attach the best run metrics to the job's device. job.device is
+            # already loaded when the job came from get_job_by_id.
             if job:
-                device = db.query(Device).filter(Device.axf_id == job.device_axf_id).first()
+                if self.id is None:  # not flushed yet; the column default would set it later
+                    self.id = str(uuid.uuid4())
+                job.best_run_id = self.id
+                job.best_test_mae = new_mae
+                device = job.device
                 if device:
                     device.update_best_metrics(update, self.number, job)
-                    db.add(device)
         else:
-            logger.info(f"Run {self.number} is not the best run for job {self.job_id} "
-                        f"({update.test_metrics['TE-all']['mae'][-1]:.4f} > "
-                        f"{best_run.test_metrics['TE-all']['mae'][-1]:.4f})")
-        db.add(self)
+            logger.info("Run %s is not the best run for job %s (%.4f > %.4f)",
+                        self.number, self.job_id, new_mae, best_mae)
+
+    def _current_best(self, job, db: Session):
+        """
+        (run id, TE-all MAE) of the job's current best run, or (None, None).
+        Uses the pointer cached on the Job; only jobs that predate it (or a
+        missing job) fall back to querying for the is_best run.
+        """
+        if job is not None and job.best_run_id is not None:
+            return job.best_run_id, job.best_test_mae
+        row = (
+            db.query(Run.id, Run.test_mae)
+            .filter(Run.job_id == self.job_id, Run.is_best)
+            .first()
+        )
+        if row is None:
+            return None, None
+        if row.test_mae is not None:
+            return row.id, row.test_mae
+        # Completed before test_mae existed; decode it from the metrics once.
+        test_metrics = db.query(Run.test_metrics).filter(Run.id == row.id).scalar()
+        return row.id, test_metrics["TE-all"]["mae"][-1]
 
     def to_dict(self):
         return {
@@ -138,7 +200,7 @@ class Run(Base):
             "learning_rate": self.learning_rate,
             "activation": self.activation,
             "optimizer": self.optimizer,
-            "layers": self.layers,
+            "layers": _decode_layers(self.layers),
             "batch_size": self.batch_size,
             "epochs": self.epochs,
             "epochs_completed": self.epochs_completed,
@@ -146,30 +208,63 @@ class Run(Base):
             "is_current": self.is_current,
             "train_metrics": self.train_metrics,
             "val_metrics": self.val_metrics,
-            "test_metrics": self.test_metrics
+            "test_metrics": self.test_metrics,
+            "test_mae": self.test_mae,
         }
 
+    def to_json(self) -> bytes:
+        """
+        Serialize to_dict() straight to JSON bytes (orjson when available), so
+        endpoints can return the body without re-validating through RunResponse.
+        """
+        return json_dumps(self.to_dict())
+
     @classmethod
     def from_dict(cls, data):
         """
         Create a Run object from a dictionary.
         Filters out unexpected keys to prevent errors.
         """
-        valid_keys = {column.name for column in cls.__table__.columns}
-        filtered_data = {key: value for key, value in data.items() if key in valid_keys}
+        filtered_data = {key: value for key, value in data.items() if key in cls._COLUMN_NAMES}
         if len(filtered_data) != len(data):
-            invalid_keys = set(data) - valid_keys
-            logger.warning(f"Invalid keys: {invalid_keys}")
+            invalid_keys = set(data) - cls._COLUMN_NAMES
+            logger.warning("Invalid keys: %s", invalid_keys)
 
         return cls(**filtered_data)
 
+    @classmethod
+    def list_summaries(cls, db: Session, job_id: str):
+        """
+        A job's runs ordered by number, with the train/val/test metric JSON
+        deferred so list views don't fetch and decode it. Serialize with
+        RunSummaryResponse; touching a deferred column loads it per row.
+        """
+        return (
+            db.query(cls)
+            .options(defer(cls.train_metrics), defer(cls.val_metrics), defer(cls.test_metrics))
+            .filter(cls.job_id == job_id)
+            .order_by(cls.number)
+            .all()
+        )
+
+    @classmethod
+    def bulk_create(cls, db: Session, rows):
+        """
+        Insert many runs from dictionaries with one ORM bulk INSERT (batched
+        multi-row VALUES) instead of a flush per added instance. Unknown keys
+        are dropped; column defaults (id, timestamps) still apply. Does not commit.
+        """
+        mappings = [{key: value for key, value in row.items() if key in cls._COLUMN_NAMES} for row in rows]
+        if mappings:
+            db.execute(insert(cls), mappings)
+
     def update_from_dict(self, data):
         """
         Update the Run object from a dictionary.
         Ignores None values unless explicitly updating a field to None.
         """
         for key, value in data.items():
-            if key in self.to_dict() and value is not None:  # Only update if not None
+            if value is not None and key in self._COLUMN_NAMES:  # Only update if not None
                 setattr(self, key, value)
 
     def to_simple(self):
@@ -195,7 +290,7 @@ class SimpleRun(BaseModel):
     number: int
     created_at: datetime
     updated_at: datetime
-    duration: float
+    duration: Optional[float]
     completed_at: Optional[datetime]
     train_metrics: Optional[dict]
     val_metrics: Optional[dict]
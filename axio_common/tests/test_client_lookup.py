@@ -0,0 +1,95 @@
+import sqlalchemy
+
+_original_create_engine = sqlalchemy.create_engine
+
+
+def _patched_create_engine(url, *args, **kwargs):
+    """Remove SQLite-incompatible pool parameters."""
+    if str(url).startswith("sqlite"):
+        kwargs.pop("max_overflow", None)
+        kwargs.pop("pool_timeout", None)
+        kwargs.pop("pool_size", None)
+        kwargs.pop("connect_args", None)
+    return _original_create_engine(url, *args, **kwargs)
+
+
+sqlalchemy.create_engine = _patched_create_engine
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from axio_common.models import Client
+from axio_common.utils import shared
+
+
+# File-backed so a second session can check what was actually committed.
+@pytest.fixture
+def engine(tmp_path):
+    engine = _original_create_engine(f"sqlite:///{tmp_path / 'clients.db'}")
+    Client.__table__.create(engine)
+    shared._client_id_cache.clear()
+    yield engine
+    shared._client_id_cache.clear()
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+
+
+def _committed_ip(engine, hostname):
+    with Session(engine) as fresh:
+        return fresh.query(Client.ip_address).filter(Client.hostname == hostname).scalar()
+
+
+def test_client_by_hostname_caches_id(db):
+    client = shared.register_client("10.0.0.7", "daemon-01", db)
+    assert shared._cached_client_id("daemon-01") == client.id
+    assert shared.client_by_hostname("daemon-01", db) is client
+
+
+def test_register_client_does_not_reload_after_commit(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    shared.register_client("10.0.0.7", "daemon-01", db)
+    assert not [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+
+
+def test_renamed_client_misses_stale_cache_entry(db):
+    client = shared.register_client("10.0.0.7", "daemon-01", db)
+    client.update_hostname("daemon-02", db)
+    db.commit()
+    assert shared.client_by_hostname("daemon-01", db) is None
+    assert shared._cached_client_id("daemon-01") is None
+    assert shared.client_by_hostname("daemon-02", db) is client
+
+
+def test_mark_active_when_active_commits_autoflushed_writes(engine, db):
+    first = shared.register_client("10.0.0.7", "daemon-01", db)
+    second = shared.register_client("10.0.0.8", "daemon-02", db)
+    first.mark_active(db)
+    second.mark_active(db)
+    shared._client_id_cache.clear()
+    first.ip_address = "10.0.0.9"
+    # Cache miss: the hostname query autoflushes the staged UPDATE before
+    # mark_active sees the already-active client.
+    assert shared.client_by_hostname("daemon-02", db) is second
+    assert _committed_ip(engine, "daemon-01") == "10.0.0.9"
+
+
+def test_resolve_hostname_commits_autoflushed_writes(engine, db):
+    first = shared.register_client("10.0.0.7", "daemon-01", db)
+    second = shared.register_client("10.0.0.8", "daemon-02", db)
+    first.mark_active(db)
+    second.mark_active(db)
+    shared._client_id_cache.clear()
+    first.ip_address = "10.0.0.9"
+    request = SimpleNamespace(headers={}, client=SimpleNamespace(host="10.0.0.8"))
+    assert shared.resolve_hostname(request, db, "daemon-02") is second
+    assert _committed_ip(engine, "daemon-01") == "10.0.0.9"
@@ -0,0 +1,115 @@
+import sqlalchemy
+
+_original_create_engine = sqlalchemy.create_engine
+
+
+def _patched_create_engine(url, *args, **kwargs):
+    """Remove SQLite-incompatible pool parameters."""
+    if str(url).startswith("sqlite"):
+        kwargs.pop("max_overflow", None)
+        kwargs.pop("pool_timeout", None)
+        kwargs.pop("pool_size", None)
+        kwargs.pop("connect_args", None)
+    return _original_create_engine(url, *args, **kwargs)
+
+
+sqlalchemy.create_engine = _patched_create_engine
+
+from types import SimpleNamespace
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from axio_common.models import Device
+from axio_common.utils import shared
+
+
+def _update(x, z):
+    return SimpleNamespace(
+        train_metrics={"split": "train"},
+        val_metrics={"split": "val"},
+        test_metrics={"TE-all": {"mae": [x, 0.0, z]}},
+    )
+
+
+def _job(model_type):
+    return SimpleNamespace(model_type=model_type, timestamp=20240101120000)
+
+
+def test_force_head_ranks_on_z_axis():
+    device = Device("10.00000002")
+    device.update_best_metrics(_update(x=9.0, z=0.5), 1, _job("force"))
+    device.update_best_metrics(_update(x=0.1, z=0.7), 2, _job("force"))
+    assert device.best_force_run == 1
+    device.update_best_metrics(_update(x=9.0, z=0.3), 3, _job("force"))
+    assert device.best_force_run == 3
+    assert device.best_force_timestamp == 20240101120000
+    assert device.best_force_train_metrics == {"split": "train"}
+    assert device.best_force_val_metrics == {"split": "val"}
+    assert device.best_moment_run is None
+
+
+def test_moment_head_ranks_on_x_axis():
+    device = Device("10.00000002")
+    device.update_best_metrics(_update(x=0.5, z=0.1), 1, _job("moment"))
+    device.update_best_metrics(_update(x=0.6, z=0.0), 2, _job("moment"))
+    assert device.best_moment_run == 1
+    assert device.best_force_run is None
+
+
+def test_legacy_all_block_is_used_for_comparison():
+    device = Device("10.00000002")
+    device.best_force_run = 7
+    device.best_force_test_metrics = {"all": {"mae": [0.0, 0.0, 0.2]}}
+    device.update_best_metrics(_update(x=0.0, z=0.4), 8, _job("force"))
+    assert device.best_force_run == 7
+
+
+def test_missing_previous_metrics_resets_best():
+    device = Device("10.00000002")
+    device.best_force_run = 7
+    device.best_force_test_metrics = {}
+    device.update_best_metrics(_update(x=0.0, z=0.9), 8, _job("force"))
+    assert device.best_force_run == 8
+
+
+def test_unknown_model_type_is_ignored():
+    device = Device("10.00000002")
+    device.update_best_metrics(_update(x=0.1, z=0.1), 1, _job("torque"))
+    assert device.best_force_run is None and device.best_moment_run is None
+
+
+def test_get_or_create_upsert_statement():
+    sql = str(Device._upsert_stmt("10.00000002").compile(dialect=postgresql.dialect()))
+    assert "INSERT INTO devices" in sql
+    assert "ON CONFLICT (axf_id) DO UPDATE SET axf_id" in sql
+    assert "RETURNING" in sql
+
+
+def test_get_or_create_inserts_once_then_gets():
+    engine = _original_create_engine("sqlite://")
+    Device.__table__.create(engine)
+    with Session(engine) as db:
+        Device.get_or_create(db, "10.00000002", "bench")
+        db.commit()
+        db.expunge_all()
+        statements = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        again = Device.get_or_create(db, "10.00000002")
+        assert again.axf_id == "10.00000002"
+        assert again.name == "bench"
+        assert not [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+        assert db.query(Device).count() == 1
+
+
+def test_resolve_device_commits_new_device(tmp_path):
+    engine = _original_create_engine(f"sqlite:///{tmp_path / 'devices.db'}")
+    Device.__table__.create(engine)
+    with Session(engine) as db:
+        device = shared.resolve_device({"DEVICE_ID": "10-00000002", "DEVICE_NAME": "bench"}, db)
+        assert device.axf_id == "10.00000002"
+    with Session(engine) as fresh:
+        assert fresh.get(Device, "10.00000002").name == "bench"
+    engine.dispose()
@@ -0,0 +1,93 @@
+import sqlalchemy
+
+_original_create_engine = sqlalchemy.create_engine
+
+
+def _patched_create_engine(url, *args, **kwargs):
+    """Remove SQLite-incompatible pool parameters."""
+    if str(url).startswith("sqlite"):
+        kwargs.pop("max_overflow", None)
+        kwargs.pop("pool_timeout", None)
+        kwargs.pop("pool_size", None)
+        kwargs.pop("connect_args", None)
+    return _original_create_engine(url, *args, **kwargs)
+
+
+sqlalchemy.create_engine = _patched_create_engine
+
+import logging
+
+import pytest
+from sqlalchemy.orm import Session
+
+from axio_common.models import Client, Job
+from axio_common.utils import shared
+from axio_common.utils.model_utils import current_time
+
+
+# Job itself needs Postgres (ARRAY columns), so these tests use transient jobs
+# and stage the caller's other writes on a client row instead. File-backed so a
+# second session can check what was actually committed.
+@pytest.fixture
+def engine(tmp_path):
+    engine = _original_create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Client.__table__.create(engine)
+    shared._client_id_cache.clear()
+    yield engine
+    shared._client_id_cache.clear()
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db):
+    return shared.register_client("10.0.0.7", "daemon-01", db)
+
+
+def _committed_ip(engine):
+    with Session(engine) as fresh:
+        return fresh.query(Client.ip_address).scalar()
+
+
+def _stage_and_autoflush(db, client):
+    # A query between staging and the no-op call (e.g. get_job_by_id loading
+    # the job) autoflushes the write, so it is no longer in db.dirty.
+    client.update_ip("10.0.0.8", db, commit=False)
+    db.query(Client).count()
+    assert not db.dirty
+
+
+def test_repeated_status_is_a_noop(db, client, caplog):
+    job = Job(id="job-1", status="running", hostname="daemon-01")
+    with caplog.at_level(logging.INFO, logger="job_manager_logger"):
+        job.update_status("running", db, hostname="daemon-01")
+    assert caplog.records == []
+    assert (job.status, job.hostname) == ("running", "daemon-01")
+
+
+def test_repeated_status_commits_autoflushed_writes(engine, db, client):
+    job = Job(id="job-1", status="running", hostname="daemon-01")
+    _stage_and_autoflush(db, client)
+    job.update_status("running", db)
+    assert _committed_ip(engine) == "10.0.0.8"
+
+
+def test_coalesced_heartbeat_is_a_noop(db, client):
+    last = current_time()
+    job = Job(id="job-1", last_heartbeat=last)
+    job.heartbeat(db)
+    assert job.last_heartbeat == last
+
+
+def test_coalesced_heartbeat_commits_autoflushed_writes(engine, db, client):
+    last = current_time()
+    job = Job(id="job-1", last_heartbeat=last)
+    _stage_and_autoflush(db, client)
+    job.heartbeat(db)
+    assert job.last_heartbeat == last
+    assert _committed_ip(engine) == "10.0.0.8"
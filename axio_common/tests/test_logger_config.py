@@ -0,0 +1,86 @@
+import logging
+import os
+import sys
+
+import pytest
+
+from axio_common.logger import logger_config
+
+
+def _make_record():
+    return logging.getLogRecordFactory()(
+        "job_manager_logger", logging.INFO, __file__, 1, "msg", None, None
+    )
+
+
+def test_record_factory_stamps_thread_local_host():
+    logger_config.hostname_filter.set_hostname("daemon-01")
+    logger_config.hostname_filter.set_ipaddress("10.0.0.7")
+    try:
+        record = _make_record()
+        assert record.hostname == "daemon-01"
+        assert record.ipaddress == "10.0.0.7"
+    finally:
+        logger_config.hostname_filter.set_hostname()
+        logger_config.hostname_filter.set_ipaddress(logger_config._CACHED_IP)
+
+
+def test_configure_once_is_idempotent():
+    factory = logging.getLogRecordFactory()
+    handlers = list(logging.getLogger().handlers)
+    logger_config.configure_once()
+    logger_config.configure_once()
+    assert logging.getLogRecordFactory() is factory
+    assert logging.getLogger().handlers == handlers
+
+
+def test_no_filters_on_job_logger():
+    assert logging.getLogger("job_manager_logger").filters == []
+
+
+def test_safe_formatter_layout_and_fallbacks():
+    record = logging.LogRecord("x", logging.WARNING, "/srv/app/worker.py", 42, "took %ss", (3,), None)
+    record.funcName = "run"
+    assert logger_config.SafeFormatter().format(record) == (
+        "[WARNING] [unknown_host/unknown_ip] [worker:run:42] took 3s"
+    )
+
+
+def test_safe_formatter_appends_exception():
+    try:
+        raise ValueError("bad")
+    except ValueError:
+        record = logging.LogRecord("x", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+    out = logger_config.SafeFormatter().format(record)
+    assert out.splitlines()[0].endswith("failed")
+    assert out.rstrip().endswith("ValueError: bad")
+
+
+def test_hostname_filter_keeps_factory_stamp():
+    record = _make_record()
+    record.hostname, record.ipaddress = "stamped", "1.1.1.1"
+    assert logger_config.hostname_filter.filter(record) is True
+    assert (record.hostname, record.ipaddress) == ("stamped", "1.1.1.1")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_child_logs_are_written():
+    # pytest swaps the root handlers out for its own capture handlers while a
+    # test runs, so put the queue handler back as it is outside the suite.
+    root = logging.getLogger()
+    root.addHandler(logger_config._queue_handler)
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # child
+        try:
+            os.close(read_fd)
+            logger_config.handler.setStream(os.fdopen(write_fd, "w"))
+            logging.getLogger("job_manager_logger").warning("from the child")
+            logger_config.handler.flush()
+        finally:
+            os._exit(0)
+    root.removeHandler(logger_config._queue_handler)
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    with os.fdopen(read_fd) as pipe:
+        assert "from the child" in pipe.read()
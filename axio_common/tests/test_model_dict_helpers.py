@@ -0,0 +1,103 @@
+import sqlalchemy
+
+_original_create_engine = sqlalchemy.create_engine
+
+
+def _patched_create_engine(url, *args, **kwargs):
+    """Remove SQLite-incompatible pool parameters."""
+    if str(url).startswith("sqlite"):
+        kwargs.pop("max_overflow", None)
+        kwargs.pop("pool_timeout", None)
+        kwargs.pop("pool_size", None)
+        kwargs.pop("connect_args", None)
+    return _original_create_engine(url, *args, **kwargs)
+
+
+sqlalchemy.create_engine = _patched_create_engine
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from axio_common.models import Client, Device, Job, Run
+from axio_common.utils import model_utils
+
+
+@pytest.mark.parametrize("model", [Client, Device, Job, Run])
+def test_column_names_match_writable_columns(model):
+    assert model._COLUMN_NAMES == frozenset(c.name for c in model.__table__.columns if c.computed is None)
+
+
+def test_device_update_from_server_skips_unknown_and_none():
+    device = Device("10.00000002")
+    device.update_from_server({"name": "Bench plate", "best_force_run": 4,
+                               "anomaly_warning": None, "not_a_column": 1})
+    assert device.name == "Bench plate"
+    assert device.best_force_run == 4
+    assert device.anomaly_warning is None
+    assert not hasattr(device, "not_a_column")
+
+
+def test_job_update_from_dict_skips_unknown_and_none():
+    job = Job(status="queued", hostname="daemon-01")
+    job.update_from_dict({"status": "running", "hostname": None, "not_a_column": 1})
+    assert job.status == "running"
+    assert job.hostname == "daemon-01"
+    assert not hasattr(job, "not_a_column")
+
+
+def test_device_bulk_from_dicts_derives_type_fields():
+    engine = _original_create_engine("sqlite://")
+    Device.__table__.create(engine)
+    with Session(engine) as db:
+        Device.bulk_from_dicts(db, [
+            {"axf_id": "10.00000001"},
+            {"axf_id": "11.00000002", "name": "Bench plate", "not_a_column": 1},
+        ])
+        db.commit()
+        rows = {d.axf_id: d for d in db.query(Device)}
+    assert rows["10.00000001"].type_id == "10"
+    assert rows["10.00000001"].name == rows["10.00000001"].type_name == "Launch Pad Lite v1.2"
+    assert rows["11.00000002"].name == "Bench plate"
+    assert rows["11.00000002"].created_at is not None
+
+
+def test_device_bulk_from_dicts_requires_axf_id():
+    with pytest.raises(ValueError):
+        Device.bulk_from_dicts(None, [{"name": "no id"}])
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_device_to_json_round_trips(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(model_utils, "orjson", None)
+    device = Device("10.00000002")
+    device.created_at = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    payload = json.loads(device.to_json())
+    assert payload["axf_id"] == "10.00000002"
+    assert payload["created_at"] == "2024-01-01T12:00:00+00:00"
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_dumps_treats_naive_datetimes_as_utc(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(model_utils, "orjson", None)
+    payload = json.loads(model_utils.json_dumps({"at": datetime(2024, 1, 1, 12, 0)}))
+    assert payload == {"at": "2024-01-01T12:00:00+00:00"}
+
+
+def test_run_update_from_dict_skips_unknown_and_none():
+    run = Run(number=1, epochs_completed=2)
+    run.update_from_dict({"epochs_completed": 5, "number": None, "not_a_column": 1})
+    assert run.epochs_completed == 5
+    assert run.number == 1
+    assert not hasattr(run, "not_a_column")
+
+
+def test_client_from_dict_applies_remaining_columns():
+    client = Client.from_dict({"hostname": "daemon-01", "ip_address": "10.0.0.7", "daemon": True,
+                               "max_jobs": 2, "status": None, "not_a_column": 1})
+    assert (client.hostname, client.max_jobs) == ("daemon-01", 2)
+    assert not hasattr(client, "not_a_column")
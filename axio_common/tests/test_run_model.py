@@ -0,0 +1,182 @@
+import sqlalchemy
+
+_original_create_engine = sqlalchemy.create_engine
+
+
+def _patched_create_engine(url, *args, **kwargs):
+    """Remove SQLite-incompatible pool parameters."""
+    if str(url).startswith("sqlite"):
+        kwargs.pop("max_overflow", None)
+        kwargs.pop("pool_timeout", None)
+        kwargs.pop("pool_size", None)
+        kwargs.pop("connect_args", None)
+    return _original_create_engine(url, *args, **kwargs)
+
+
+sqlalchemy.create_engine = _patched_create_engine
+
+from sqlalchemy import Computed
+from sqlalchemy.ext.compiler import compiles
+
+
+@compiles(Computed, "sqlite")
+def _computed_as_plain_column(element, compiler, **kw):
+    """Run.duration's generated expression is Postgres-only; SQLite gets a plain column."""
+    return ""
+
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from sqlalchemy.orm import Session
+
+from axio_common.models import Run
+from axio_common.models.run import CompleteRunRequest, RunResponse, RunSummaryResponse, runs_to_json
+
+_CONFIG = {"learning_rate": 0.01, "activation": "relu", "optimizer_name": "adam",
+           "layers": [64, 32], "batch_size": 16, "epochs": 10}
+
+
+def _run(**overrides):
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    fields = dict(id="r1", job_id="j1", number=1, created_at=now, updated_at=now,
+                  epochs_completed=0, is_best=False, is_current=True)
+    fields.update(overrides)
+    return Run(**fields)
+
+
+def test_initialize_from_config_stores_layers_as_list():
+    run = _run()
+    run.initialize_from_config(_CONFIG)
+    assert run.layers == [64, 32]
+    assert RunResponse.model_validate(run).layers == [64, 32]
+
+
+def test_legacy_json_string_layers_are_decoded():
+    run = _run(layers="[64, 32]")
+    assert run.to_dict()["layers"] == [64, 32]
+    assert RunResponse.model_validate(run).layers == [64, 32]
+
+
+def test_bulk_create_applies_defaults_and_drops_unknown_keys():
+    engine = _original_create_engine("sqlite://")
+    Run.__table__.create(engine)
+    with Session(engine) as db:
+        Run.bulk_create(db, [
+            {"job_id": "j1", "number": 1, "layers": [64]},
+            {"job_id": "j1", "number": 2, "not_a_column": 1},
+        ])
+        db.commit()
+        runs = db.query(Run).order_by(Run.number).all()
+    assert [run.number for run in runs] == [1, 2]
+    assert all(run.id and run.created_at for run in runs)
+    assert runs[0].layers == [64]
+
+
+def test_list_summaries_defers_metric_columns():
+    engine = _original_create_engine("sqlite://")
+    Run.__table__.create(engine)
+    with Session(engine) as db:
+        Run.bulk_create(db, [
+            {"job_id": "j1", "number": 2, "test_metrics": {"TE-all": {"mae": [0.1]}}},
+            {"job_id": "j1", "number": 1},
+            {"job_id": "j2", "number": 1},
+        ])
+        db.commit()
+        runs = Run.list_summaries(db, "j1")
+        assert [run.number for run in runs] == [1, 2]
+        assert all("test_metrics" not in run.__dict__ for run in runs)
+        summary = RunSummaryResponse.model_validate(runs[1])
+        assert "test_metrics" not in summary.model_dump()
+
+
+def test_runs_to_json_serializes_rows():
+    runs = [_run(id="r1", test_metrics={"TE-all": {"mae": [0.1]}}), _run(id="r2", number=2)]
+    full = json.loads(runs_to_json(runs))
+    assert [row["id"] for row in full] == ["r1", "r2"]
+    assert full[0]["test_metrics"] == {"TE-all": {"mae": [0.1]}}
+    assert "test_metrics" not in json.loads(runs_to_json(runs, summary=True))[0]
+
+
+def test_duration_is_not_writable():
+    assert "duration" not in Run._COLUMN_NAMES
+    assert Run.from_dict({"number": 1, "duration": 5.0}).duration is None
+
+
+def _complete_request(mae):
+    metrics = {"TE-all": {"mae": [1.0, mae]}}
+    return CompleteRunRequest(job_id="j1", run_number=2, train_metrics={}, val_metrics={},
+                              test_metrics=metrics, epochs_completed=10, hostname="daemon-01")
+
+
+def _job(best_run_id=None, best_test_mae=None):
+    # Job needs Postgres (ARRAY columns); complete() only touches these attributes.
+    device = SimpleNamespace(calls=[])
+    device.update_best_metrics = lambda update, number, job: device.calls.append(number)
+    return SimpleNamespace(best_run_id=best_run_id, best_test_mae=best_test_mae, device=device)
+
+
+@pytest.fixture
+def db():
+    engine = _original_create_engine("sqlite://")
+    Run.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _is_best(db, run_id):
+    return db.query(Run.is_best).filter(Run.id == run_id).scalar()
+
+
+def test_complete_uses_job_pointer_and_clears_old_best(db):
+    db.add(_run(id="r1", is_best=True, test_mae=0.5))
+    db.commit()
+    job = _job("r1", 0.5)
+    run = _run(id="r2", number=2)
+    run.complete(job, _complete_request(0.3), db)
+    assert run.is_best and run.test_mae == 0.3
+    assert (job.best_run_id, job.best_test_mae) == ("r2", 0.3)
+    assert job.device.calls == [2]
+    assert _is_best(db, "r1") is False
+
+
+def test_complete_keeps_better_pointer(db):
+    job = _job("r1", 0.2)
+    run = _run(id="r2", number=2)
+    run.complete(job, _complete_request(0.3), db)
+    assert not run.is_best
+    assert (job.best_run_id, job.best_test_mae) == ("r1", 0.2)
+    assert job.device.calls == []
+
+
+def test_current_best_falls_back_to_is_best_row(db):
+    db.add_all([_run(id="r1", is_best=True, test_mae=0.5), _run(id="r0", job_id="j2", is_best=True, test_mae=0.1)])
+    db.commit()
+    run = _run(id="r2", number=2)
+    assert run._current_best(_job(), db) == ("r1", 0.5)
+    assert run._current_best(None, db) == ("r1", 0.5)
+    run.complete(None, _complete_request(0.3), db)
+    assert run.is_best
+    assert _is_best(db, "r1") is False
+    assert _is_best(db, "r0") is True
+
+
+def test_current_best_decodes_legacy_test_metrics(db):
+    db.add(_run(id="r1", is_best=True, test_metrics={"TE-all": {"mae": [0.9, 0.2]}}))
+    db.commit()
+    run = _run(id="r2", number=2)
+    assert run._current_best(None, db) == ("r1", 0.2)
+    run.complete(_job(), _complete_request(0.3), db)
+    assert not run.is_best
+    assert _is_best(db, "r1") is True
+
+
+def test_complete_assigns_id_before_pointing_job_at_run(db):
+    job = _job()
+    run = _run(id=None, number=1)
+    run.complete(job, _complete_request(0.3), db)
+    assert run.is_best and run.id is not None
+    assert job.best_run_id == run.id
+    assert job.device.calls == [1]
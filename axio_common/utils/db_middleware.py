@@ -5,6 +5,28 @@ from sqlalchemy.orm import Session
 from axio_common.logger import logger
 from axio_common.models import Run, Job, Client, Device
 
+# NOTE: The Firebase <-> SQL sync below is retired and kept for reference only:
+# firebase_admin is not a dependency of this package, and the `database` /
+# `database_server` Firestore handles it imports no longer exist. If revived:
+#
+# - Outbound: capture to_dict() payloads in before_flush, keyed by
+#   (collection, doc id) so the last write wins; send them from after_commit
+#   (drop them on rollback) as WriteBatches of <= 500 ops on a background
+#   executor. Gate it with a contextvars.ContextVar, not the FIREBASE_SYNC
+#   global, and register listeners from one {model: collection} table.
+# - Inbound: page through each collection with start_after, ordered by
+#   updated_at then __name__ and filtered server-side on updated_at > the max
+#   local value; skip a collection whose count() and max updated_at already
+#   match SQL. Read devices via one collection_group query.
+# - Per page: look up existing rows once with id.in_(ids), bulk-insert new
+#   ones (bulk_from_dicts / Run.bulk_create), update the rest; flush() +
+#   expunge_all() per page and commit once per sync, with expire_on_commit off.
+# - Concurrency is threads only (no asyncio port): the outbound executor above,
+#   and a producer thread fetching page N+1 into a queue.Queue(maxsize=2) while
+#   page N is written.
+# - SQL timestamps are timezone-aware; write updated_at to Firestore as a
+#   native Timestamp and never compare naive datetimes.
+
 # Firestore collection
 # devices_doc = database.document("devices")
 # clients_collection = database_server.collection("clients")
@@ -1,5 +1,50 @@
-from datetime import datetime, timezone
+import json
+import uuid
+from datetime import date, datetime, timezone
+
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib json fallback is equivalent
+    orjson = None
 
 
 def current_time():
-    return datetime.now(timezone.utc)
\ No newline at end of file
+    return datetime.now(timezone.utc)
+
+
+def json_loads(data):
+    """Parse a JSON str/bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_default(value):
+    # orjson handles these natively (naive datetimes as UTC, numpy via tolist);
+    # mirror its output for the stdlib path.
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if hasattr(value, "tolist"):  # numpy arrays/scalars in metrics payloads
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_dumps(obj) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON bytes, using orjson when it is installed.
+    Response bodies can be built from this directly instead of going through
+    Pydantic validation plus jsonable_encoder.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=_json_default,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY,
+        )
+    return json.dumps(obj, default=_json_default, separators=(",", ":"), ensure_ascii=False).encode()
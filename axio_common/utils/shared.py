@@ -1,5 +1,7 @@
+import threading
+import time
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from axio_common.models import Device, Job, Client
 from axio_common.logger import logger, hostname_filter
@@ -8,13 +10,41 @@ from axio_common.logger import logger, hostname_filter
 MAX_TIME_DIFF = 600  # Maximum time difference in seconds between current time and last heartbeat
 MAX_INACTIVE_TIME = 86400  # Maximum time in seconds for a client to be considered inactive
 
+# hostname -> client id, so the per-request client lookup in resolve_hostname
+# is a primary-key SELECT instead of an indexed WHERE on hostname. It still
+# costs one query per request (a fresh session has an empty identity map); it
+# only makes that query cheaper. A hit is re-checked against the loaded row's
+# hostname, so a renamed or deleted client just falls through to the query.
+_CLIENT_ID_CACHE_TTL = 60.0  # seconds
+_CLIENT_ID_CACHE_MAX = 4096
+_client_id_cache: dict = {}
+_client_id_cache_lock = threading.Lock()
+
+
+def _cached_client_id(hostname: str) -> Optional[str]:
+    with _client_id_cache_lock:
+        entry = _client_id_cache.get(hostname)
+    if entry and time.monotonic() - entry[1] < _CLIENT_ID_CACHE_TTL:
+        return entry[0]
+    return None
+
+
+def _remember_client_id(hostname: str, client_id: Optional[str]) -> None:
+    with _client_id_cache_lock:
+        if client_id is None:
+            _client_id_cache.pop(hostname, None)
+            return
+        if len(_client_id_cache) >= _CLIENT_ID_CACHE_MAX:
+            _client_id_cache.clear()
+        _client_id_cache[hostname] = (client_id, time.monotonic())
+
 
 def register_client(client_ip: str, hostname: Optional[str], db: Session, daemon: Optional[bool] = True) -> Client | None:
     """
     Register a new client in the database.
     """
     if hostname is None:
-        logger.info(f"Client hostname not provided for {client_ip}")
+        logger.info("Client hostname not provided for %s", client_ip)
         return None
     new_client = Client(
         hostname=hostname,
@@ -22,43 +52,56 @@ def register_client(client_ip: str, hostname: Optional[str], db: Session, daemon
         daemon=daemon
     )
     db.add(new_client)
+    # Capture the id before commit: reading it afterwards would reload the
+    # expired row with a SELECT just to fill the cache.
+    db.flush()
+    client_id = new_client.id
     db.commit()
-    db.refresh(new_client)
-    logger.info(f"New client registered: {client_ip} -> {new_client.hostname}")
+    _remember_client_id(hostname, client_id)
+    logger.info("New client registered: %s -> %s", client_ip, hostname)
     return new_client
 
 
 def check_client_hostname(client, hostname: Optional[str], db: Session):
     if client and hostname and hostname != client.hostname and hostname != f'{client.ip_address}':
         client.update_hostname(hostname, db)
-        logger.info(f"Client hostname updated: {client.hostname} -> {hostname}")
+        logger.info("Client hostname updated: %s -> %s", client.hostname, hostname)
     elif not client:
-        logger.warning(f"Client {client.hostname} not found.")
+        logger.warning("Client %s not found.", client.hostname)
 
 
-def client_by_hostname(hostname: str, db: Session, update_activity=True) -> Optional[Client]:
+def client_by_hostname(hostname: str, db: Session, update_activity=True, commit=True) -> Optional[Client]:
     """
     Fetch a client by its hostname from the database.
     """
-    client = db.query(Client).filter(Client.hostname == hostname).first()
+    client = None
+    client_id = _cached_client_id(hostname)
+    if client_id is not None:
+        client = db.get(Client, client_id)
+        if client is not None and client.hostname != hostname:
+            client = None
+    if client is None:
+        client = db.query(Client).filter(Client.hostname == hostname).first()
+        _remember_client_id(hostname, client.id if client else None)
     if client:
         if update_activity:
-            client.mark_active(db)
+            client.mark_active(db, commit=commit)
     return client
 
 
-def client_by_id(client_id: str, db: Session) -> Optional[Client]:
+def client_by_id(client_id: str, db: Session, commit=True) -> Optional[Client]:
     """
     Fetch a client by its ID from the database.
     """
-    client = db.query(Client).filter(Client.id == client_id).first()
+    client = db.get(Client, client_id) if client_id else None
     if client:
-        client.mark_active(db)
+        client.mark_active(db, commit=commit)
     return client
 
 
 def device_by_id(device_id: str, db: Session):
-    return db.query(Device).filter(Device.axf_id == device_id).first()
+    # Primary-key get: served from the identity map when already loaded.
+    return db.get(Device, device_id) if device_id else None
 
 
 # Function to resolve the hostname for a given client IP address
@@ -69,11 +112,12 @@ def resolve_hostname(client_request, db: Session, hostname: Optional[str] = None
     # Extract client IP
     client_ip = client_request.headers.get("X-Forwarded-For", client_request.client.host).split(",")[0].strip()
 
-    # Lookup client in the database
+    # Lookup client in the database. The activity/IP updates below are
+    # batched into one commit at the end instead of one per change.
     if hostname:
-        client = client_by_hostname(hostname, db)
+        client = client_by_hostname(hostname, db, commit=False)
     else:
-        logger.warning(f'Client hostname not provided for {client_ip}')
+        logger.warning("Client hostname not provided for %s", client_ip)
         return None
     if not client:
         client = register_client(client_ip, hostname, db)
@@ -81,7 +125,11 @@ def resolve_hostname(client_request, db: Session, hostname: Optional[str] = None
     hostname_filter.set_hostname(client.hostname)
     hostname_filter.set_ipaddress(client_ip)
     if client_ip != client.ip_address:
-        client.update_ip(client_ip, db)
+        client.update_ip(client_ip, db, commit=False)
+    # Not `if db.dirty`: the lookups above autoflush, so pending writes may
+    # already be flushed into the open transaction.
+    if db.in_transaction():
+        db.commit()
     return client
 
 
@@ -90,23 +138,25 @@ def resolve_device(job_config, db: Session):
     device_id = job_config.get("DEVICE_ID").replace("-", ".")
     device = device_by_id(device_id, db)
     if not device:
-        device_name = job_config.get("DEVICE_NAME", None)
-        logger.info(f"Device {device_id} not found.")
-        device = Device(device_id, device_name)
-        db.add(device)
+        logger.info("Device %s not found.", device_id)
+        # Race-safe upsert on Postgres; commit right away (as callers rely
+        # on) so the new row is persisted and its key lock released.
+        device = Device.get_or_create(db, device_id, job_config.get("DEVICE_NAME", None))
         db.commit()
-        db.refresh(device)
-
     return device
 
 
 def get_job_by_id(job_id: str, db: Session):
-    logger.info(f"Searching for job {job_id}")
-    job = db.query(Job).filter(Job.id == job_id).first()
+    logger.info("Searching for job %s", job_id)
+    # Primary-key get (no SELECT when the job is already in the session).
+    # Many-to-one, so joining the device costs nothing extra on a single-row
+    # lookup and saves the lazy SELECT when the caller touches job.device
+    # (status transitions, Run.complete).
+    job = db.get(Job, job_id, options=[joinedload(Job.device)]) if job_id else None
     if job:
-        logger.info(f"Job {job_id} found.")
+        logger.info("Job %s found.", job_id)
     else:
-        logger.error(f"Job {job_id} not found.")
+        logger.error("Job %s not found.", job_id)
     return job
 
 
@@ -122,5 +172,5 @@ def update_job_status(job, status: str, db: Session, hostname=None, reason=None)
     # Update the job's status
     job.update_status(status, db, hostname, reason=reason)
 
-    logger.info(f"Job {job.id} status updated to {status}")
+    logger.info("Job %s status updated to %s", job.id, status)
     return job